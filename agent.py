@@ -2950,7 +2950,16 @@ class MegaAdvancedBrowserAgent:
             self.browser_pool.append(driver)
             
         logger.info(f"Browser pool initialized with {len(self.browser_pool) + 1} instances")
-    
+
+    def cleanup(self):
+        """Quit the main driver and any pooled browser instances."""
+        for driver in [self.driver] + self.browser_pool:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.warning(f"Error quitting browser: {e}")
+        self.browser_pool = []
+
     def execute_parallel_tasks(self, tasks: List[Dict], max_workers: int = 4) -> List[ActionResult]:
         """Execute multiple tasks in parallel across browser instances."""
         results = []
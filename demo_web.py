@@ -4,11 +4,32 @@ Simple Demo Web App - Shows the interface working without complex dependencies
 This demonstrates the ChatGPT-like interface with simulated agent responses.
 """
 
-from flask import Flask, render_template_string
+import gzip
+import hashlib
+import os
+import re
 
-app = Flask(__name__)
+from flask import Flask, Response, request
+from werkzeug.http import parse_accept_header
 
-# Simple HTML template with inline demo functionality
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+app = Flask(__name__, static_folder='static', static_url_path='/static')
+
+# Static assets are referenced with a content hash, so they can be cached forever
+STATIC_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# The page itself is revalidated with its ETag once this expires
+PAGE_CACHE_CONTROL = 'public, max-age=300'
+
+def _asset_version(relative_path: str) -> str:
+    """Short content hash of a static asset, used to bust long-lived caches."""
+    with open(os.path.join(app.static_folder, relative_path), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+# Simple HTML template; styles and scripts live in static/css and static/js
 DEMO_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
@@ -17,338 +38,9 @@ DEMO_TEMPLATE = """
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>AI Browser Agent - Web Interface Demo</title>
     
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-        
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            height: 100vh;
-            overflow: hidden;
-        }
-        
-        .app-container {
-            display: flex;
-            height: 100vh;
-            background: #f8f9fa;
-        }
-        
-        /* Sidebar */
-        .sidebar {
-            width: 300px;
-            background: #2c3e50;
-            color: white;
-            display: flex;
-            flex-direction: column;
-            border-right: 1px solid #34495e;
-        }
-        
-        .sidebar-header {
-            padding: 20px;
-            background: #34495e;
-            border-bottom: 1px solid #4a5f7a;
-        }
-        
-        .sidebar-header h1 {
-            font-size: 1.4rem;
-            margin-bottom: 5px;
-            color: #ecf0f1;
-        }
-        
-        .sidebar-header p {
-            color: #bdc3c7;
-            font-size: 0.9rem;
-        }
-        
-        .status-indicator {
-            display: flex;
-            align-items: center;
-            gap: 8px;
-            margin-top: 15px;
-            padding: 10px;
-            background: rgba(0,0,0,0.2);
-            border-radius: 6px;
-        }
-        
-        .status-dot {
-            width: 8px;
-            height: 8px;
-            border-radius: 50%;
-            background: #27ae60;
-            animation: pulse 2s infinite;
-        }
-        
-        @keyframes pulse {
-            0% { opacity: 1; }
-            50% { opacity: 0.5; }
-            100% { opacity: 1; }
-        }
-        
-        .status-text {
-            font-size: 0.85rem;
-            color: #bdc3c7;
-        }
-        
-        .browser-info {
-            padding: 20px;
-            border-bottom: 1px solid #34495e;
-        }
-        
-        .browser-info h3 {
-            font-size: 1rem;
-            margin-bottom: 10px;
-            color: #ecf0f1;
-        }
-        
-        .browser-url {
-            background: rgba(0,0,0,0.2);
-            padding: 8px 12px;
-            border-radius: 4px;
-            font-size: 0.8rem;
-            color: #bdc3c7;
-            word-break: break-all;
-            margin-bottom: 8px;
-        }
-        
-        .browser-title {
-            font-size: 0.85rem;
-            color: #ecf0f1;
-            margin-bottom: 15px;
-        }
-        
-        .action-buttons {
-            display: flex;
-            gap: 8px;
-            flex-wrap: wrap;
-        }
-        
-        .btn-small {
-            padding: 6px 12px;
-            background: #3498db;
-            color: white;
-            border: none;
-            border-radius: 4px;
-            font-size: 0.8rem;
-            cursor: pointer;
-            transition: background 0.2s;
-        }
-        
-        .btn-small:hover {
-            background: #2980b9;
-        }
-        
-        /* Main Chat Area */
-        .chat-container {
-            flex: 1;
-            display: flex;
-            flex-direction: column;
-            background: white;
-        }
-        
-        .chat-header {
-            padding: 15px 20px;
-            background: white;
-            border-bottom: 1px solid #e1e5e9;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }
-        
-        .chat-header h2 {
-            color: #2c3e50;
-            font-size: 1.3rem;
-            margin-bottom: 5px;
-        }
-        
-        .chat-subtitle {
-            color: #7f8c8d;
-            font-size: 0.9rem;
-        }
-        
-        .messages-container {
-            flex: 1;
-            overflow-y: auto;
-            padding: 20px;
-            display: flex;
-            flex-direction: column;
-            gap: 15px;
-        }
-        
-        .message {
-            max-width: 70%;
-            padding: 12px 16px;
-            border-radius: 18px;
-            position: relative;
-            animation: messageSlideIn 0.3s ease-out;
-        }
-        
-        @keyframes messageSlideIn {
-            from {
-                opacity: 0;
-                transform: translateY(10px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
-        
-        .message.user {
-            align-self: flex-end;
-            background: #007AFF;
-            color: white;
-            border-bottom-right-radius: 4px;
-        }
-        
-        .message.agent {
-            align-self: flex-start;
-            background: #f1f3f5;
-            color: #2c3e50;
-            border-bottom-left-radius: 4px;
-            border: 1px solid #e1e5e9;
-        }
-        
-        .message-content {
-            margin: 0;
-            line-height: 1.4;
-        }
-        
-        .message-time {
-            font-size: 0.75rem;
-            opacity: 0.7;
-            margin-top: 5px;
-        }
-        
-        .typing-indicator {
-            align-self: flex-start;
-            background: #f1f3f5;
-            border: 1px solid #e1e5e9;
-            padding: 16px;
-            border-radius: 18px;
-            border-bottom-left-radius: 4px;
-            display: none;
-        }
-        
-        .typing-dots {
-            display: flex;
-            gap: 4px;
-            align-items: center;
-        }
-        
-        .typing-dot {
-            width: 8px;
-            height: 8px;
-            background: #7f8c8d;
-            border-radius: 50%;
-            animation: typingBounce 1.4s infinite ease-in-out;
-        }
-        
-        .typing-dot:nth-child(1) { animation-delay: -0.32s; }
-        .typing-dot:nth-child(2) { animation-delay: -0.16s; }
-        .typing-dot:nth-child(3) { animation-delay: 0s; }
-        
-        @keyframes typingBounce {
-            0%, 80%, 100% {
-                transform: scale(0.8);
-                opacity: 0.5;
-            }
-            40% {
-                transform: scale(1);
-                opacity: 1;
-            }
-        }
-        
-        .typing-text {
-            margin-left: 10px;
-            color: #7f8c8d;
-            font-size: 0.9rem;
-        }
-        
-        /* Input Area */
-        .input-container {
-            padding: 20px;
-            background: white;
-            border-top: 1px solid #e1e5e9;
-        }
-        
-        .input-wrapper {
-            display: flex;
-            gap: 10px;
-            align-items: flex-end;
-        }
-        
-        .message-input {
-            flex: 1;
-            min-height: 44px;
-            max-height: 120px;
-            padding: 12px 16px;
-            border: 2px solid #e1e5e9;
-            border-radius: 22px;
-            resize: none;
-            font-family: inherit;
-            font-size: 0.95rem;
-            line-height: 1.4;
-            outline: none;
-            transition: border-color 0.2s;
-        }
-        
-        .message-input:focus {
-            border-color: #007AFF;
-        }
-        
-        .message-input::placeholder {
-            color: #7f8c8d;
-        }
-        
-        .send-button {
-            width: 44px;
-            height: 44px;
-            background: #007AFF;
-            color: white;
-            border: none;
-            border-radius: 50%;
-            cursor: pointer;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            transition: background 0.2s, transform 0.1s;
-            font-size: 1.1rem;
-        }
-        
-        .send-button:hover {
-            background: #0056b3;
-            transform: scale(1.05);
-        }
-        
-        .welcome-message {
-            text-align: center;
-            color: #7f8c8d;
-            margin: 40px 20px;
-        }
-        
-        .welcome-message h3 {
-            color: #2c3e50;
-            margin-bottom: 10px;
-        }
-        
-        .demo-note {
-            background: #e8f4fd;
-            border: 1px solid #bee5eb;
-            color: #0c5460;
-            padding: 15px;
-            border-radius: 8px;
-            margin: 20px;
-            text-align: center;
-        }
-        
-        .demo-note strong {
-            color: #0a3d42;
-        }
-    </style>
+    <link rel="stylesheet" href="/static/css/demo.css?v={{ css_version }}">
 </head>
-<body>
+<body data-reply-delay-ms="2000">
     <div class="app-container">
         <!-- Sidebar -->
         <div class="sidebar">
@@ -368,8 +60,8 @@ DEMO_TEMPLATE = """
                 <div class="browser-title">Google</div>
                 
                 <div class="action-buttons">
-                    <button class="btn-small" onclick="showDemo()">📸 Screenshot</button>
-                    <button class="btn-small" onclick="updateInfo()">🔄 Refresh Info</button>
+                    <button class="btn-small" data-action="demo">📸 Screenshot</button>
+                    <button class="btn-small" data-action="refresh">🔄 Refresh Info</button>
                 </div>
             </div>
         </div>
@@ -415,9 +107,8 @@ DEMO_TEMPLATE = """
                         class="message-input" 
                         placeholder="Type your browser automation request here..."
                         rows="1"
-                        onkeydown="handleKeyPress(event)"
                     ></textarea>
-                    <button id="sendButton" class="send-button" onclick="sendMessage()">
+                    <button id="sendButton" class="send-button">
                         ➤
                     </button>
                 </div>
@@ -425,113 +116,80 @@ DEMO_TEMPLATE = """
         </div>
     </div>
 
-    <script>
-        let messageCount = 0;
-        
-        function handleKeyPress(event) {
-            if (event.key === 'Enter' && !event.shiftKey) {
-                event.preventDefault();
-                sendMessage();
-            }
-        }
-        
-        function sendMessage() {
-            const input = document.getElementById('messageInput');
-            const message = input.value.trim();
-            
-            if (!message) return;
-            
-            // Add user message
-            addMessage(message, 'user');
-            input.value = '';
-            
-            // Show typing indicator
-            showTyping();
-            
-            // Simulate agent response
-            setTimeout(() => {
-                hideTyping();
-                
-                let response = '';
-                if (message.toLowerCase().includes('navigate') || message.toLowerCase().includes('go to')) {
-                    response = `I'll navigate to the requested page. In the real implementation, I would use Selenium WebDriver to control the browser and navigate to the specified URL.`;
-                } else if (message.toLowerCase().includes('search')) {
-                    response = `I'll search for "${message.replace(/search for|search/gi, '').trim()}". The real implementation would locate the search box and enter your query.`;
-                } else if (message.toLowerCase().includes('screenshot')) {
-                    response = `I'll take a screenshot of the current browser page. The real implementation would capture and display the actual browser content.`;
-                } else {
-                    response = `I understand you want to: "${message}". In the full implementation, I would process this request using the browser automation system and perform the appropriate actions.`;
-                }
-                
-                addMessage(response, 'agent');
-                addMessage('Actions completed: analyze_request ✓, execute_action ✓, update_status ✓', 'agent', true);
-            }, 2000);
-        }
-        
-        function addMessage(text, type, isSubtle = false) {
-            const container = document.getElementById('messagesContainer');
-            const typingIndicator = document.getElementById('typingIndicator');
-            
-            const messageDiv = document.createElement('div');
-            messageDiv.className = `message ${type}`;
-            if (isSubtle) messageDiv.style.opacity = '0.8';
-            
-            const contentP = document.createElement('p');
-            contentP.className = 'message-content';
-            contentP.textContent = text;
-            
-            const timeDiv = document.createElement('div');
-            timeDiv.className = 'message-time';
-            timeDiv.textContent = new Date().toLocaleTimeString();
-            
-            messageDiv.appendChild(contentP);
-            messageDiv.appendChild(timeDiv);
-            
-            container.insertBefore(messageDiv, typingIndicator);
-            container.scrollTop = container.scrollHeight;
-        }
-        
-        function showTyping() {
-            document.getElementById('typingIndicator').style.display = 'block';
-            document.getElementById('messagesContainer').scrollTop = document.getElementById('messagesContainer').scrollHeight;
-        }
-        
-        function hideTyping() {
-            document.getElementById('typingIndicator').style.display = 'none';
-        }
-        
-        function showDemo() {
-            alert('Screenshot feature: In the real implementation, this would display a live screenshot of the browser session in a modal window.');
-        }
-        
-        function updateInfo() {
-            document.querySelector('.browser-url').textContent = 'https://example.com/updated-page';
-            document.querySelector('.browser-title').textContent = 'Updated Page Title';
-            addMessage('Browser info refreshed successfully!', 'agent', true);
-        }
-        
-        // Auto-resize textarea
-        document.getElementById('messageInput').addEventListener('input', function() {
-            this.style.height = 'auto';
-            this.style.height = Math.min(this.scrollHeight, 120) + 'px';
-        });
-        
-        console.log('🚀 AI Browser Agent Web Interface Demo Loaded');
-        console.log('📱 Modern ChatGPT-like interface for browser automation');
-        console.log('🌐 Real implementation includes live WebSocket communication');
-    </script>
+    <script src="/static/js/demo.js?v={{ js_version }}" defer></script>
 </body>
 </html>
 """
 
+_HTML_COMMENT_RE = re.compile(r'<!--.*?-->', re.S)
+_INTER_TAG_WS_RE = re.compile(r'>\s+<')
+_WS_RUN_RE = re.compile(r'\s{2,}')
+
+def _minify_html(html: str) -> str:
+    """Strip comments and indentation whitespace without changing what renders."""
+    html = _HTML_COMMENT_RE.sub('', html)
+    html = _INTER_TAG_WS_RE.sub('><', html)
+    return _WS_RUN_RE.sub(' ', html).strip()
+
+# The template has no per-request variables, so render it once at import and
+# serve the same bytes on every request instead of going through Jinja each time.
+_RENDERED_HTML = _minify_html(app.jinja_env.from_string(DEMO_TEMPLATE).render(
+    css_version=_asset_version('css/demo.css'),
+    js_version=_asset_version('js/demo.js'),
+))
+_HTML_BYTES = _RENDERED_HTML.encode('utf-8')
+
+# Precompress once so each request only picks a blob based on Accept-Encoding.
+_HTML_VARIANTS = {'gzip': gzip.compress(_HTML_BYTES, 9)}
+if brotli is not None:
+    _HTML_VARIANTS['br'] = brotli.compress(_HTML_BYTES, quality=11)
+
+# One ETag per encoded variant, since each is a different byte stream
+_HTML_DIGEST = hashlib.sha256(_HTML_BYTES).hexdigest()[:16]
+_HTML_ETAGS = {encoding: f'{_HTML_DIGEST}-{encoding}' for encoding in _HTML_VARIANTS}
+_HTML_ETAGS[None] = _HTML_DIGEST
+
+def _pick_encoding(accept_encoding: str):
+    """Return the best precompressed encoding the client accepts, or None.
+    
+    An encoding listed with q=0 is refused, not accepted.
+    """
+    accepted = parse_accept_header(accept_encoding)
+    for encoding in ('br', 'gzip'):
+        if encoding in _HTML_VARIANTS and accepted.quality(encoding) > 0:
+            return encoding
+    return None
+
 @app.route('/')
 def demo():
-    return render_template_string(DEMO_TEMPLATE)
+    encoding = _pick_encoding(request.headers.get('Accept-Encoding', ''))
+    body = _HTML_VARIANTS[encoding] if encoding else _HTML_BYTES
+    response = Response(body, mimetype='text/html')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = PAGE_CACHE_CONTROL
+    response.set_etag(_HTML_ETAGS[encoding])
+    # Turns into an empty 304 when the client's If-None-Match already matches
+    return response.make_conditional(request)
+
+@app.after_request
+def add_static_cache_headers(response):
+    """Let browsers keep versioned static assets instead of refetching them."""
+    # Errors must stay revalidatable, or a 404 mid-deploy is pinned for a year
+    if (response.status_code in (200, 304)
+            and request.path.startswith(app.static_url_path + '/')):
+        response.headers['Cache-Control'] = STATIC_CACHE_CONTROL
+    return response
 
 if __name__ == '__main__':
     print("🌐 AI Browser Agent - Demo Web Interface")
     print("🚀 Starting demo server on http://localhost:8080")
     print("📱 This demonstrates the ChatGPT-like interface design")
     print("💡 The real implementation (web_app.py) includes live browser automation")
+    print("🏭 For production, serve with multiple workers instead of this dev server:")
+    print("   gunicorn -w $(nproc) -k gthread --threads 8 -b 0.0.0.0:8080 demo_web:app")
     
-    app.run(host='0.0.0.0', port=8080, debug=True)
\ No newline at end of file
+    # Debug mode turns on the reloader and debugger, so only enable it on request
+    debug = os.environ.get('FLASK_DEBUG', '').lower() in ('1', 'true', 'yes')
+    app.run(host='0.0.0.0', port=8080, debug=debug, use_reloader=debug, threaded=True)
\ No newline at end of file
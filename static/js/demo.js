@@ -0,0 +1,153 @@
+let messageCount = 0;
+
+// Reuse one formatter; toLocaleTimeString() builds a new one on every call
+const TIME_FMT = new Intl.DateTimeFormat(undefined, { hour: 'numeric', minute: '2-digit', second: '2-digit' });
+
+// Keyword matching used by the simulated agent, built once
+const SEARCH_RE = /search for|search/gi;
+
+// One regex pass picks the reply. Each alternative is anchored lookahead, so
+// priority follows the order below rather than where the keyword appears.
+const DISPATCH_RE = /^(?=.*?(navigate|go to))|^(?=.*?(search))|^(?=.*?(screenshot))/is;
+
+// Simulated replies, indexed by the DISPATCH_RE group that matched
+const RESPONSE_HANDLERS = [
+    null,
+    () => `I'll navigate to the requested page. In the real implementation, I would use Selenium WebDriver to control the browser and navigate to the specified URL.`,
+    message => `I'll search for "${message.replace(SEARCH_RE, '').trim()}". The real implementation would locate the search box and enter your query.`,
+    () => `I'll take a screenshot of the current browser page. The real implementation would capture and display the actual browser content.`
+];
+
+function defaultResponse(message) {
+    return `I understand you want to: "${message}". In the full implementation, I would process this request using the browser automation system and perform the appropriate actions.`;
+}
+
+// The script is deferred, so the DOM is parsed by the time this runs
+const INPUT = document.getElementById('messageInput');
+const SEND = document.getElementById('sendButton');
+const MSG_CONTAINER = document.getElementById('messagesContainer');
+const TYPING = document.getElementById('typingIndicator');
+const BROWSER_URL = document.querySelector('.browser-url');
+const BROWSER_TITLE = document.querySelector('.browser-title');
+let scrollPending = false;
+
+// Simulated agent "thinking" time, configurable via <body data-reply-delay-ms>
+const REPLY_DELAY_MS = parseInt(document.body.dataset.replyDelayMs, 10) || 2000;
+let pendingReply = null;
+
+function handleKeyPress(event) {
+    if (event.key === 'Enter' && !event.shiftKey) {
+        event.preventDefault();
+        sendMessage();
+    }
+}
+
+function sendMessage() {
+    const message = INPUT.value.trim();
+
+    // One simulated reply at a time; Enter is ignored like the disabled button
+    if (!message || pendingReply) return;
+
+    // Add user message
+    addMessage(message, 'user');
+    INPUT.value = '';
+
+    // Show typing indicator
+    showTyping();
+
+    // Simulate agent response; sending is disabled until it arrives
+    SEND.disabled = true;
+    pendingReply = setTimeout(() => {
+        pendingReply = null;
+        SEND.disabled = false;
+        hideTyping();
+
+        const match = DISPATCH_RE.exec(message);
+        const group = match ? match.findIndex((value, i) => i > 0 && value !== undefined) : -1;
+        const response = group > 0 ? RESPONSE_HANDLERS[group](message) : defaultResponse(message);
+
+        addMessage(response, 'agent');
+        addMessage('Actions completed: analyze_request ✓, execute_action ✓, update_status ✓', 'agent', true);
+    }, REPLY_DELAY_MS);
+}
+
+function addMessage(text, type, isSubtle = false) {
+    const messageDiv = document.createElement('div');
+    messageDiv.className = `message ${type}`;
+    if (isSubtle) messageDiv.style.opacity = '0.8';
+
+    const contentP = document.createElement('p');
+    contentP.className = 'message-content';
+    contentP.textContent = text;
+
+    const timeDiv = document.createElement('div');
+    timeDiv.className = 'message-time';
+    timeDiv.textContent = TIME_FMT.format(new Date());
+
+    messageDiv.appendChild(contentP);
+    messageDiv.appendChild(timeDiv);
+
+    MSG_CONTAINER.insertBefore(messageDiv, TYPING);
+    scheduleScrollToBottom();
+}
+
+// Read scrollHeight once per frame instead of forcing layout after every append
+function scheduleScrollToBottom() {
+    if (scrollPending) return;
+    scrollPending = true;
+    requestAnimationFrame(() => {
+        scrollPending = false;
+        MSG_CONTAINER.scrollTop = MSG_CONTAINER.scrollHeight;
+    });
+}
+
+function showTyping() {
+    TYPING.style.display = 'block';
+    scheduleScrollToBottom();
+}
+
+function hideTyping() {
+    TYPING.style.display = 'none';
+}
+
+function showDemo() {
+    alert('Screenshot feature: In the real implementation, this would display a live screenshot of the browser session in a modal window.');
+}
+
+function updateInfo() {
+    BROWSER_URL.textContent = 'https://example.com/updated-page';
+    BROWSER_TITLE.textContent = 'Updated Page Title';
+    addMessage('Browser info refreshed successfully!', 'agent', true);
+}
+
+// One delegated listener for the sidebar buttons instead of inline onclick attributes
+const SIDEBAR_ACTIONS = { demo: showDemo, refresh: updateInfo };
+document.querySelector('.sidebar').addEventListener('click', event => {
+    const button = event.target.closest('[data-action]');
+    const action = button && SIDEBAR_ACTIONS[button.dataset.action];
+    if (action) action();
+});
+
+INPUT.addEventListener('keydown', handleKeyPress);
+SEND.addEventListener('click', sendMessage);
+
+// Pause looping animations while the tab is in the background
+document.addEventListener('visibilitychange', () => {
+    document.body.classList.toggle('paused', document.hidden);
+});
+
+// Auto-resize textarea, at most once per frame however fast the user types
+let resizePending = false;
+INPUT.addEventListener('input', function() {
+    if (resizePending) return;
+    resizePending = true;
+    requestAnimationFrame(() => {
+        resizePending = false;
+        INPUT.style.height = 'auto';
+        INPUT.style.height = Math.min(INPUT.scrollHeight, 120) + 'px';
+    });
+});
+
+if (window.DEBUG) {
+    console.log('🚀 AI Browser Agent Web Interface Demo Loaded\n📱 Modern ChatGPT-like interface for browser automation\n🌐 Real implementation includes live WebSocket communication');
+}
@@ -4,17 +4,35 @@ Web Application for AI Browser Agent
 Transforms the terminal-based agent into a modern web application with ChatGPT-like interface.
 """
 
+# Patch blocking stdlib I/O first so Selenium and worker code yield to the
+# eventlet hub that serves the websockets
+import eventlet
+eventlet.monkey_patch()
+import eventlet.event
+import eventlet.semaphore
+import eventlet.wsgi
+
 import os
+import re
 import json
+import socket
 import time
+import queue
+import hashlib
 import threading
 import base64
+from contextlib import contextmanager
+from functools import lru_cache
+from urllib.parse import urlsplit
+from collections import deque
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 import logging
 
-from flask import Flask, render_template, request, jsonify
+import orjson
+from flask import Flask, Response, render_template, request
+from flask.json.provider import JSONProvider
 from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask_cors import CORS
 
@@ -23,94 +41,516 @@ from agent import MegaAdvancedBrowserAgent
 # Import Selenium components needed for web actions
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import WebDriverException
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Agent pool sizing: how many warm agents to keep ready, and how many returned
+# agents to keep around for reuse before quitting the extras
+AGENT_POOL_MIN_READY = int(os.environ.get('AGENT_POOL_MIN_READY', 1))
+AGENT_POOL_MAX_IDLE = int(os.environ.get('AGENT_POOL_MAX_IDLE', 4))
+# Seconds a spare agent beyond AGENT_POOL_MIN_READY may sit unused before it is shut down
+AGENT_POOL_IDLE_TTL = float(os.environ.get('AGENT_POOL_IDLE_TTL', 300))
+# Screenshot requests for the same page within this window reuse the last frame
+SCREENSHOT_CACHE_TTL = float(os.environ.get('SCREENSHOT_CACHE_TTL', 0.5))
+# Screenshot encoding: 'jpeg' or 'webp' via Chrome DevTools at SCREENSHOT_QUALITY
+# (0-100), or 'png' for lossless frames through plain WebDriver
+SCREENSHOT_FORMAT = os.environ.get('SCREENSHOT_FORMAT', 'jpeg').lower()
+SCREENSHOT_QUALITY = int(os.environ.get('SCREENSHOT_QUALITY', 60))
+# Seconds to wait for a client to acknowledge a screenshot before sending another
+FRAME_ACK_TIMEOUT = float(os.environ.get('FRAME_ACK_TIMEOUT', 5.0))
+# Messages kept per session; older ones are dropped as new ones arrive
+HISTORY_MAX = int(os.environ.get('HISTORY_MAX', 200))
+# Sessions idle longer than this are reaped, checked every SESSION_REAP_INTERVAL
+SESSION_IDLE_TIMEOUT = float(os.environ.get('SESSION_IDLE_TIMEOUT', 1800))
+SESSION_REAP_INTERVAL = float(os.environ.get('SESSION_REAP_INTERVAL', 60))
+# Seconds the encoded /api/sessions and /api/health bodies are served from cache
+SESSIONS_CACHE_TTL = float(os.environ.get('SESSIONS_CACHE_TTL', 1.0))
+HEALTH_CACHE_TTL = float(os.environ.get('HEALTH_CACHE_TTL', 5.0))
+# Every command keyword in a single alternation; none is a prefix of another, so
+# findall() reports each one present in a single pass over the message
+COMMAND_KEYWORDS_RE = re.compile(r'navigate|go to|google|github|example|search|screenshot|capture')
+# URL and title in a single script call
+PAGE_INFO_JS = "return {url: location.href, title: document.title};"
+# Keyword -> intent; when several intents match, the first in INTENT_PRIORITY wins
+KEYWORD_INTENTS = {
+    'navigate': 'navigate',
+    'go to': 'navigate',
+    'search': 'search',
+    'screenshot': 'capture',
+    'capture': 'capture'
+}
+INTENT_PRIORITY = ('navigate', 'search', 'capture')
+# Only messages up to this many characters have their intent memoized
+INTENT_CACHE_MAX_LENGTH = 256
+# Intents whose actions can move the page, invalidating the cached URL/title
+PAGE_CHANGING_INTENTS = frozenset({'navigate', 'search'})
+# Canned navigations reply at once; the page load is then polled for up to
+# NAVIGATION_TIMEOUT seconds before navigation_complete is sent
+NAVIGATION_TIMEOUT = float(os.environ.get('NAVIGATION_TIMEOUT', 15))
+NAVIGATION_POLL_INTERVAL = 0.25
+# Sites the navigate intent knows, checked in this order: keyword -> (url, display name)
+NAVIGATION_TARGETS = {
+    'google': ('https://www.google.com', 'Google.com'),
+    'github': ('https://github.com', 'GitHub.com'),
+    'example': ('https://example.com', 'Example.com')
+}
+# Appended to the echo of any message no intent recognizes
+HELP_TEXT_SUFFIX = (
+    ' I can help you with browser automation tasks like:\n\n'
+    '• "Navigate to Google" or "Go to GitHub"\n'
+    '• "Search for AI news" (after navigating to Google)\n'
+    '• "Take a screenshot"\n\n'
+    'Please give me a specific command to execute.'
+)
+# actions_taken records for each fixed outcome, shared by every turn that reports it.
+# Never mutate these; plain dicts in tuples because orjson can't encode MappingProxyType.
+NAVIGATION_ACTIONS = {
+    keyword: ({'action': f'navigate_to_{keyword}', 'status': 'completed'},)
+    for keyword in NAVIGATION_TARGETS
+}
+PARSE_NAVIGATION_ACTIONS = ({'action': 'parse_navigation_request', 'status': 'completed'},)
+SEARCH_PREREQUISITE_ACTIONS = ({'action': 'search_prerequisite_check', 'status': 'completed'},)
+SEARCH_VALIDATION_ACTIONS = ({'action': 'search_validation', 'status': 'completed'},)
+SEARCH_FAILED_ACTIONS = ({'action': 'search_attempt', 'status': 'failed'},)
+SEARCH_ACTIONS = (
+    {'action': 'find_search_box', 'status': 'completed'},
+    {'action': 'enter_search_terms', 'status': 'completed'},
+    {'action': 'submit_search', 'status': 'completed'}
+)
+CAPTURE_FAILED_ACTIONS = ({'action': 'capture_screenshot', 'status': 'failed'},)
+CAPTURE_ACTIONS = ({'action': 'capture_screenshot', 'status': 'completed'},)
+ANALYZE_ACTIONS = ({'action': 'analyze_request', 'status': 'completed'},)
+ERROR_HANDLING_ACTION = {'action': 'error_handling', 'status': 'failed'}
+# Pending connections the production listener queues before refusing new ones
+LISTEN_BACKLOG = int(os.environ.get('LISTEN_BACKLOG', 2048))
+# Fixed kernel send/receive buffer size for accepted connections. Unset by default:
+# setting it turns off Linux's TCP buffer autotuning, which usually does better.
+SOCKET_BUFFER_SIZE = int(os.environ['SOCKET_BUFFER_SIZE']) if os.environ.get('SOCKET_BUFFER_SIZE') else None
+# Pin the production server to this CPU (unset leaves scheduling to the OS). Affinity
+# is inherited by child processes, so browsers are launched with BROWSER_CPUS, the
+# process's mask from before the pin, instead.
+SERVER_CPU = int(os.environ['SERVER_CPU']) if os.environ.get('SERVER_CPU') else None
+BROWSER_CPUS = os.sched_getaffinity(0) if hasattr(os, 'sched_getaffinity') else None
+# Engine.IO heartbeat: idle connections are pinged every SOCKETIO_PING_INTERVAL
+# seconds and dropped if no reply arrives within SOCKETIO_PING_TIMEOUT
+SOCKETIO_PING_INTERVAL = float(os.environ.get('SOCKETIO_PING_INTERVAL', 45))
+SOCKETIO_PING_TIMEOUT = float(os.environ.get('SOCKETIO_PING_TIMEOUT', 20))
+# Largest inbound Socket.IO message accepted, in bytes
+MAX_HTTP_BUFFER_SIZE = int(os.environ.get('MAX_HTTP_BUFFER_SIZE', 2 << 20))
+# Long-polling responses smaller than this many bytes are sent uncompressed
+COMPRESSION_THRESHOLD = int(os.environ.get('COMPRESSION_THRESHOLD', 1024))
+# Serve every session from tabs of one shared Chrome instead of a browser each.
+# Sessions then share cookies and storage, so this is opt-in.
+SHARED_BROWSER = os.environ.get('SHARED_BROWSER', '').lower() in ('1', 'true', 'yes')
+# Upper bound on agent turns processed concurrently
+AGENT_WORKER_POOL_SIZE = int(os.environ.get('AGENT_WORKER_POOL_SIZE', 256))
+# Per-session send_message rate limit: MESSAGE_RATE messages per second on
+# average, with bursts of up to MESSAGE_BURST
+MESSAGE_RATE = float(os.environ.get('MESSAGE_RATE', 2.0))
+MESSAGE_BURST = float(os.environ.get('MESSAGE_BURST', 5))
+
+@contextmanager
+def browser_cpu_affinity():
+    """Widen the CPU mask to BROWSER_CPUS while browsers are launched inside the block.
+    
+    Without this, chromedriver and Chrome would inherit the SERVER_CPU pin and all
+    run on the server's single core.
+    """
+    if SERVER_CPU is None or BROWSER_CPUS is None:
+        yield
+        return
+    pinned = os.sched_getaffinity(0)
+    os.sched_setaffinity(0, BROWSER_CPUS)
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, pinned)
+
+def create_agent() -> MegaAdvancedBrowserAgent:
+    """Construct a browser agent configured for web sessions."""
+    with browser_cpu_affinity():
+        return MegaAdvancedBrowserAgent(
+            headless=False,  # Set to True for production
+            window_size=(1920, 1080),
+            enable_extensions=True,
+            enable_ai=True,
+            multi_browser=False,
+            browser_count=1
+        )
+
+def now_ms() -> int:
+    """Epoch milliseconds for event timestamps; cheaper to build and encode than ISO strings."""
+    return int(time.time() * 1000)
+
+def read_page_info(driver) -> tuple:
+    """Return (url, title) in one WebDriver round trip instead of two."""
+    info = driver.execute_script(PAGE_INFO_JS)
+    return info['url'], info['title']
+
+def wipe_browser_state(driver):
+    """Erase what one user left in a browser before it is handed to another.
+    
+    delete_all_cookies() only reaches the current document's origin, so cookies
+    and the HTTP cache are cleared browser-wide over CDP, and local storage,
+    IndexedDB and the like for every origin any open tab has visited. The old
+    tabs, with their history and session storage, are replaced by a blank one.
+    """
+    origins = set()
+    old_handles = list(driver.window_handles)
+    for handle in old_handles:
+        driver.switch_to.window(handle)
+        history = driver.execute_cdp_cmd('Page.getNavigationHistory', {})
+        for entry in history['entries']:
+            parts = urlsplit(entry['url'])
+            if parts.scheme in ('http', 'https'):
+                origins.add(f"{parts.scheme}://{parts.netloc}")
+    driver.switch_to.new_window('tab')
+    fresh_handle = driver.current_window_handle
+    for handle in old_handles:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(fresh_handle)
+    driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+    driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+    for origin in origins:
+        driver.execute_cdp_cmd('Storage.clearDataForOrigin',
+                               {'origin': origin, 'storageTypes': 'all'})
+
+def _scan_intent(message_lower: str) -> tuple:
+    keywords = frozenset(COMMAND_KEYWORDS_RE.findall(message_lower))
+    intents = {KEYWORD_INTENTS[k] for k in keywords if k in KEYWORD_INTENTS}
+    intent = next((i for i in INTENT_PRIORITY if i in intents), None)
+    return intent, keywords
+
+_scan_short_intent = lru_cache(maxsize=512)(_scan_intent)
+
+def classify_intent(message_lower: str) -> tuple:
+    """Return (intent or None, keywords found) for a normalized chat message.
+
+    Short commands repeat a lot ("take a screenshot", "go to google"), so their
+    results are memoized; longer free-form messages are scanned every time so
+    they can't pin memory in the cache.
+    """
+    if len(message_lower) <= INTENT_CACHE_MAX_LENGTH:
+        return _scan_short_intent(message_lower)
+    return _scan_intent(message_lower)
+
+class AgentPool:
+    """Keeps pre-initialized browser agents ready so sessions skip Chrome startup."""
+    
+    def __init__(self, factory=create_agent, min_ready: int = AGENT_POOL_MIN_READY,
+                 max_idle: int = AGENT_POOL_MAX_IDLE, idle_ttl: float = AGENT_POOL_IDLE_TTL,
+                 retry_interval: float = 30.0):
+        self.factory = factory
+        self.min_ready = min_ready
+        self.max_idle = max(max_idle, min_ready)
+        self.idle_ttl = idle_ttl
+        self.retry_interval = retry_interval
+        # (agent, monotonic time it became idle)
+        self.ready: queue.Queue = queue.Queue()
+        self._refill_needed = threading.Event()
+        self._refill_needed.set()
+        
+        if self.min_ready > 0:
+            # A green thread, like the rest of the server's background work
+            eventlet.spawn_n(self._refill_loop)
+    
+    def acquire(self) -> Optional[MegaAdvancedBrowserAgent]:
+        """Take a warm agent, or return None if none is ready yet."""
+        try:
+            agent, _ = self.ready.get_nowait()
+        except queue.Empty:
+            agent = None
+        self._refill_needed.set()
+        return agent
+    
+    def release(self, agent: MegaAdvancedBrowserAgent):
+        """Reset an agent and return it to the pool, or quit it if the pool is full."""
+        if self.ready.qsize() >= self.max_idle:
+            self._dispose(agent)
+            return
+        try:
+            wipe_browser_state(agent.driver)
+        except Exception as e:
+            logger.warning("Discarding agent that failed to reset: %s", e)
+            self._dispose(agent)
+            return
+        self.ready.put((agent, time.monotonic()))
+    
+    def trim_idle(self):
+        """Quit spare agents idle longer than idle_ttl, always keeping min_ready warm."""
+        now = time.monotonic()
+        fresh, stale = [], []
+        while True:
+            try:
+                entry = self.ready.get_nowait()
+            except queue.Empty:
+                break
+            (fresh if now - entry[1] < self.idle_ttl else stale).append(entry)
+        while stale and len(fresh) < self.min_ready:
+            fresh.append(stale.pop())
+        for entry in fresh:
+            self.ready.put(entry)
+        for agent, _ in stale:
+            logger.info("Shutting down agent idle for over %ss", self.idle_ttl)
+            self._dispose(agent)
+    
+    def _dispose(self, agent: MegaAdvancedBrowserAgent):
+        try:
+            agent.cleanup()
+        except Exception as e:
+            logger.error("Error shutting down pooled agent: %s", e)
+    
+    def _refill_loop(self):
+        while True:
+            self._refill_needed.wait()
+            self._refill_needed.clear()
+            while self.ready.qsize() < self.min_ready:
+                try:
+                    self.ready.put((self.factory(), time.monotonic()))
+                    logger.info("Agent pool warmed: %s ready", self.ready.qsize())
+                except Exception as e:
+                    logger.error("Error pre-warming browser agent: %s", e)
+                    time.sleep(self.retry_interval)
+
+class SharedBrowserHost:
+    """Owns a single browser agent and hands out one tab per session."""
+    
+    def __init__(self, factory=create_agent):
+        self.factory = factory
+        self.agent: Optional[MegaAdvancedBrowserAgent] = None
+        # The driver can only drive one tab at a time
+        self.lock = eventlet.semaphore.Semaphore()
+    
+    def open_tab(self) -> str:
+        """Open a new tab, starting the browser on first use, and return its handle."""
+        with self.lock:
+            if self.agent is None:
+                self.agent = self.factory()
+            driver = self.agent.driver
+            driver.switch_to.new_window('tab')
+            return driver.current_window_handle
+    
+    def close_tab(self, handle: str):
+        """Close a session's tab, leaving the browser running for other sessions."""
+        with self.lock:
+            driver = self.agent.driver
+            driver.switch_to.window(handle)
+            driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+
+class SessionClosedError(Exception):
+    """Raised by agent_context when the session was cleaned up while waiting for its browser."""
+
 @dataclass
 class SessionManager:
     """Manages browser agent sessions for multiple users."""
     
-    def __init__(self):
+    def __init__(self, pool: Optional[AgentPool] = None):
         self.sessions: Dict[str, Dict] = {}
-        self.lock = threading.Lock()
+        # Only guards create's check-then-insert and cleanup's unregister. Single dict reads and
+        # writes need no lock: green threads switch only at I/O, never mid-statement.
+        self.lock = eventlet.semaphore.Semaphore()
+        # Kept alongside the dict so health checks read a plain int
+        self.session_count = 0
+        # Session ids whose browser is still starting -> event fired with the finished session
+        self.creating: Dict[str, eventlet.event.Event] = {}
+        self.shared_host = SharedBrowserHost() if SHARED_BROWSER else None
+        self.pool = pool or AgentPool(min_ready=0 if SHARED_BROWSER else AGENT_POOL_MIN_READY)
     
     def create_session(self, session_id: str, user_data: Dict = None) -> Dict:
         """Create a new browser agent session."""
+        # Reserve the id under the lock, but start the browser outside it so one
+        # slow Chrome launch doesn't hold up every other connecting client
         with self.lock:
             if session_id in self.sessions:
                 return self.sessions[session_id]
+            creating = self.creating.get(session_id)
+            owner = creating is None
+            if owner:
+                creating = self.creating[session_id] = eventlet.event.Event()
+        if not owner:
+            # Another call is already starting this session's browser
+            return creating.wait()
+        
+        # Epoch seconds; formatted only when sessions are listed
+        now = time.time()
+        
+        # Lease a warm agent, falling back to a cold start when none is ready
+        try:
+            window_handle = None
+            if self.shared_host:
+                window_handle = self.shared_host.open_tab()
+                agent = self.shared_host.agent
+            else:
+                agent = self.pool.acquire() or create_agent()
             
-            # Create new agent instance for this session
-            try:
-                agent = MegaAdvancedBrowserAgent(
-                    headless=False,  # Set to True for production
-                    window_size=(1920, 1080),
-                    enable_extensions=True,
-                    enable_ai=True,
-                    multi_browser=False,
-                    browser_count=1
-                )
-                
-                session_data = {
-                    'id': session_id,
-                    'agent': agent,
-                    'created_at': datetime.now(),
-                    'last_activity': datetime.now(),
-                    'status': 'initialized',
-                    'user_data': user_data or {},
-                    'message_history': [],
-                    'browser_url': 'about:blank',
-                    'browser_title': 'New Tab',
-                    'browser_initialized': False
-                }
-                
-                self.sessions[session_id] = session_data
-                logger.info(f"Created new session: {session_id}")
-                return session_data
-                
-            except Exception as e:
-                logger.error(f"Error creating session {session_id}: {e}")
-                # Create a minimal session even if agent creation fails
-                session_data = {
-                    'id': session_id,
-                    'agent': None,
-                    'created_at': datetime.now(),
-                    'last_activity': datetime.now(),
-                    'status': 'error',
-                    'user_data': user_data or {},
-                    'message_history': [],
-                    'browser_url': 'Error',
-                    'browser_title': 'Failed to initialize',
-                    'browser_initialized': False,
-                    'error': str(e)
-                }
-                self.sessions[session_id] = session_data
-                return session_data
+            session_data = self._new_session_dict(session_id, agent, window_handle, now, user_data)
+            logger.info("Created new session: %s", session_id)
+            
+        except Exception as e:
+            logger.error("Error creating session %s: %s", session_id, e)
+            # Create a minimal session even if agent creation fails
+            session_data = self._new_session_dict(session_id, None, None, now, user_data)
+            session_data.update({
+                'status': 'error',
+                'browser_url': 'Error',
+                'browser_title': 'Failed to initialize',
+                'error': str(e)
+            })
+        
+        with self.lock:
+            self.sessions[session_id] = session_data
+            self.session_count += 1
+            del self.creating[session_id]
+        creating.send(session_data)
+        return session_data
+
+    @staticmethod
+    def _new_session_dict(session_id: str, agent, window_handle: Optional[str],
+                          now: float, user_data: Optional[Dict]) -> Dict:
+        """Build a session's state around its (possibly missing) agent."""
+        return {
+            'id': session_id,
+            'agent': agent,
+            'window_handle': window_handle,
+            'created_at': now,
+            'last_activity': now,
+            'status': 'initialized',
+            'user_data': user_data or {},
+            'message_history': deque(maxlen=HISTORY_MAX),
+            'pending_turns': deque(),
+            'turn_running': False,
+            # Token bucket for send_message: (tokens left, monotonic time of last refill)
+            'message_tokens': (float(MESSAGE_BURST), time.monotonic()),
+            'browser_url': 'about:blank',
+            'browser_title': 'New Tab',
+            # Agents start their driver on construction, so a leased agent is ready
+            'browser_initialized': agent is not None and agent.driver is not None,
+            # Cached URL/title match the browser until a navigate or search turn; set
+            # again only once that page has finished loading
+            'browser_info_fresh': False,
+            # Page loads still being watched; until they finish the URL/title is in flux
+            'navigations_pending': 0,
+            # (url, title) the client last received, to skip repeating it
+            'sent_browser_info': None,
+            # Held for any use or release of this session's agent, so cleanup can't
+            # hand it back mid-action; never taken re-entrantly
+            'lock': threading.Lock(),
+            # Set by cleanup, under the lock, once the agent has been handed back
+            'released': False,
+            'screenshot_lock': threading.Lock(),
+            'last_screenshot': None,
+            'frame_inflight': None,
+            'summary': None
+        }
     
     def get_session(self, session_id: str) -> Optional[Dict]:
         """Get session by ID."""
         return self.sessions.get(session_id)
     
+    def snapshot(self) -> List[tuple]:
+        """Return (session_id, session) pairs, safe to iterate while sessions come and go."""
+        with self.lock:
+            return list(self.sessions.items())
+    
     def update_activity(self, session_id: str):
         """Update last activity timestamp."""
-        with self.lock:
-            if session_id in self.sessions:
-                self.sessions[session_id]['last_activity'] = datetime.now()
+        session = self.sessions.get(session_id)
+        if session is not None:
+            session['last_activity'] = time.time()
+    
+    def summary_bytes(self, session: Dict) -> bytes:
+        """Return the session's encoded /api/sessions entry, re-encoding only after it changed."""
+        state = (session['last_activity'], session['status'],
+                 session['browser_url'], session['browser_title'])
+        cached = session['summary']
+        if cached is None or cached[0] != state:
+            cached = (state, orjson.dumps({
+                'id': session['id'],
+                'created_at': datetime.fromtimestamp(session['created_at']),
+                'last_activity': datetime.fromtimestamp(state[0]),
+                'status': state[1],
+                'browser_url': state[2],
+                'browser_title': state[3]
+            }))
+            session['summary'] = cached
+        return cached[1]
+    
+    @contextmanager
+    def agent_context(self, session: Dict):
+        """Hold the session's browser for a run of driver calls.
+        
+        Takes the session's own lock, so cleanup can't hand the agent back to the pool
+        mid-action; shared-browser sessions also wait for the host and switch the
+        driver to their own tab first. Raises SessionClosedError if cleanup got the
+        lock first, as the agent may already belong to another session.
+        """
+        with session['lock']:
+            if session['released']:
+                raise SessionClosedError(session['id'])
+            if not session['window_handle']:
+                yield
+                return
+            with self.shared_host.lock:
+                self.shared_host.agent.driver.switch_to.window(session['window_handle'])
+                yield
     
     def cleanup_session(self, session_id: str):
         """Clean up and remove session."""
+        # Unregister under the manager lock, then release the browser under the
+        # session's own lock so other sessions aren't held up by driver calls
         with self.lock:
-            if session_id in self.sessions:
-                session = self.sessions[session_id]
-                try:
-                    if 'agent' in session and session['agent']:
-                        session['agent'].cleanup()
-                except Exception as e:
-                    logger.error(f"Error cleaning up session {session_id}: {e}")
-                finally:
-                    del self.sessions[session_id]
-                    logger.info(f"Cleaned up session: {session_id}")
+            session = self.sessions.pop(session_id, None)
+            creating = self.creating.get(session_id) if session is None else None
+            if session is not None:
+                self.session_count -= 1
+        if session is None:
+            if creating is not None:
+                # Still starting its browser: wait for it to be registered, then
+                # release it rather than leave it leased to a dead client
+                creating.wait()
+                self.cleanup_session(session_id)
+            return
+        with session['lock']:
+            session['released'] = True
+            try:
+                if session['window_handle']:
+                    self.shared_host.close_tab(session['window_handle'])
+                elif 'agent' in session and session['agent']:
+                    self.pool.release(session['agent'])
+            except Exception as e:
+                logger.error("Error cleaning up session %s: %s", session_id, e)
+            finally:
+                logger.info("Cleaned up session: %s", session_id)
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, which also encodes datetimes natively."""
+    
+    def dumps(self, obj: Any, **kwargs) -> str:
+        return orjson.dumps(obj).decode()
+    
+    def loads(self, s, **kwargs) -> Any:
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response instead of round-tripping through str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
+class OrjsonSocketIOJSON:
+    """orjson wrapped in the json-module interface Socket.IO packets expect."""
+    
+    @staticmethod
+    def dumps(obj: Any, **kwargs) -> str:
+        # Socket.IO passes stdlib options such as separators; orjson output is already compact
+        return orjson.dumps(obj).decode()
+    
+    @staticmethod
+    def loads(s, **kwargs) -> Any:
+        return orjson.loads(s)
 
 class WebAgentApp:
     """Main web application class."""
@@ -118,6 +558,7 @@ class WebAgentApp:
     def __init__(self, host='0.0.0.0', port=5000, debug=False):
         self.app = Flask(__name__, static_folder='static', static_url_path='/static')
         self.app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
+        self.app.json = OrjsonProvider(self.app)
         
         # Configure CORS
         CORS(self.app, cors_allowed_origins="*")
@@ -127,6 +568,14 @@ class WebAgentApp:
             self.app, 
             cors_allowed_origins="*",
             async_mode='eventlet',
+            json=OrjsonSocketIOJSON,
+            # Websocket frames get permessage-deflate from eventlet whenever the
+            # browser offers it; this covers clients stuck on long-polling
+            http_compression=True,
+            compression_threshold=COMPRESSION_THRESHOLD,
+            ping_interval=SOCKETIO_PING_INTERVAL,
+            ping_timeout=SOCKETIO_PING_TIMEOUT,
+            max_http_buffer_size=MAX_HTTP_BUFFER_SIZE,
             logger=False,
             engineio_logger=False
         )
@@ -134,6 +583,23 @@ class WebAgentApp:
         # Initialize session manager
         self.session_manager = SessionManager()
         
+        # Chat intents -> turn handlers; anything else gets the help reply
+        self._intent_handlers = {
+            'navigate': self._handle_navigate,
+            'search': self._handle_search,
+            'capture': self._handle_capture
+        }
+        
+        # Green threads for agent turns instead of one OS thread per message
+        self.worker_pool = eventlet.GreenPool(size=AGENT_WORKER_POOL_SIZE)
+        
+        # Encoded bodies for the monitoring endpoints: key -> (monotonic ts, bytes)
+        self._json_cache: Dict[str, tuple] = {}
+        
+        # Reclaim browsers from clients that vanished without a clean disconnect
+        self.reaped_sessions = 0
+        self.socketio.start_background_task(self._reap_idle_sessions)
+        
         # Setup routes and socket handlers
         self._setup_routes()
         self._setup_socket_handlers()
@@ -145,34 +611,52 @@ class WebAgentApp:
     def _setup_routes(self):
         """Setup Flask routes."""
         
+        # The chat shell has no per-request variables, so render it once up front
+        with self.app.app_context():
+            index_html = render_template('index.html').encode('utf-8')
+        index_etag = hashlib.sha256(index_html).hexdigest()[:16]
+        
         @self.app.route('/')
         def index():
             """Main chat interface."""
-            return render_template('index.html')
+            if self.debug:
+                # Pick up template edits while developing
+                return render_template('index.html')
+            response = Response(index_html, mimetype='text/html')
+            response.set_etag(index_etag)
+            return response.make_conditional(request)
         
         @self.app.route('/api/health')
         def health_check():
             """Health check endpoint."""
-            return jsonify({
+            return self._cached_json('health', HEALTH_CACHE_TTL, lambda: orjson.dumps({
                 'status': 'healthy',
-                'timestamp': datetime.now().isoformat(),
-                'active_sessions': len(self.session_manager.sessions)
-            })
+                'timestamp': datetime.now(),
+                'active_sessions': self.session_manager.session_count,
+                'reaped_sessions': self.reaped_sessions
+            }))
         
         @self.app.route('/api/sessions')
         def list_sessions():
             """List active sessions."""
-            sessions = []
-            for session_id, session_data in self.session_manager.sessions.items():
-                sessions.append({
-                    'id': session_id,
-                    'created_at': session_data['created_at'].isoformat(),
-                    'last_activity': session_data['last_activity'].isoformat(),
-                    'status': session_data['status'],
-                    'browser_url': session_data['browser_url'],
-                    'browser_title': session_data['browser_title']
-                })
-            return jsonify({'sessions': sessions})
+            def build():
+                # Splice per-session encodings together rather than building one big list
+                summaries = b','.join(self.session_manager.summary_bytes(session)
+                                      for _, session in self.session_manager.snapshot())
+                return b'{"sessions":[' + summaries + b']}'
+            return self._cached_json('sessions', SESSIONS_CACHE_TTL, build)
+    
+    def _cached_json(self, key: str, ttl: float, build) -> Response:
+        """Serve a JSON body from build() (which returns encoded bytes) at most once per ttl seconds.
+        
+        Monitoring polls then cost a dict lookup however many sessions exist.
+        """
+        now = time.monotonic()
+        cached = self._json_cache.get(key)
+        if cached is None or now - cached[0] >= ttl:
+            cached = (now, build())
+            self._json_cache[key] = cached
+        return Response(cached[1], mimetype='application/json')
     
     def _setup_socket_handlers(self):
         """Setup SocketIO event handlers."""
@@ -180,13 +664,13 @@ class WebAgentApp:
         @self.socketio.on('connect')
         def handle_connect():
             """Handle client connection."""
-            logger.info(f"Client connected: {request.sid}")
+            logger.debug("Client connected: %s", request.sid)
             emit('connected', {'status': 'connected', 'session_id': request.sid})
         
         @self.socketio.on('disconnect')
         def handle_disconnect():
             """Handle client disconnection."""
-            logger.info(f"Client disconnected: {request.sid}")
+            logger.debug("Client disconnected: %s", request.sid)
             # Clean up session if it exists
             self.session_manager.cleanup_session(request.sid)
         
@@ -209,10 +693,10 @@ class WebAgentApp:
                     'message': 'Browser agent session initialized successfully!'
                 })
                 
-                logger.info(f"Session initialized: {session_id}")
+                logger.info("Session initialized: %s", session_id)
                 
             except Exception as e:
-                logger.error(f"Error initializing session: {e}")
+                logger.error("Error initializing session: %s", e)
                 emit('error', {'message': f'Failed to initialize session: {str(e)}'})
         
         @self.socketio.on('send_message')
@@ -231,6 +715,13 @@ class WebAgentApp:
                     emit('error', {'message': 'Session not found. Please refresh the page.'})
                     return
                 
+                if not self._take_message_token(session):
+                    emit('error', {
+                        'message': 'You are sending messages too quickly. Please wait a moment.',
+                        'code': 'rate_limited'
+                    })
+                    return
+                
                 # Update activity
                 self.session_manager.update_activity(session_id)
                 
@@ -238,25 +729,28 @@ class WebAgentApp:
                 user_msg = {
                     'type': 'user',
                     'content': message,
-                    'timestamp': datetime.now().isoformat()
+                    'timestamp': now_ms()
                 }
                 session['message_history'].append(user_msg)
                 
-                # Emit user message confirmation
-                emit('message_received', user_msg)
-                
-                # Show typing indicator
-                emit('typing_start', {'type': 'agent'})
+                # Confirm the message and show the typing indicator in one frame
+                self._emit_batch([
+                    ('message_received', user_msg),
+                    ('typing_start', {'type': 'agent'}),
+                    ('status_update', {
+                        'status': 'processing',
+                        'message': 'Agent is analyzing your request...'
+                    })
+                ])
                 
-                # Process message with agent in a separate thread
-                threading.Thread(
-                    target=self._process_agent_message,
-                    args=(session_id, message),
-                    daemon=True
-                ).start()
+                # Queue the turn; a session runs its turns one at a time on a pooled green thread
+                session['pending_turns'].append(message)
+                if not session['turn_running']:
+                    session['turn_running'] = True
+                    self.worker_pool.spawn_n(self._drain_turns, session_id)
                 
             except Exception as e:
-                logger.error(f"Error handling message: {e}")
+                logger.error("Error handling message: %s", e)
                 emit('error', {'message': f'Error processing message: {str(e)}'})
         
         @self.socketio.on('get_browser_screenshot')
@@ -273,31 +767,40 @@ class WebAgentApp:
                 agent = session['agent']
                 
                 # Check if browser is initialized
-                if not hasattr(agent, 'driver') or agent.driver is None:
+                if not session['browser_initialized']:
                     emit('error', {'message': 'Browser session not initialized. Please send a command first.'})
                     return
                 
-                # Take screenshot
+                # A client still receiving the last frame will show it soon; don't queue another
+                inflight = session['frame_inflight']
+                if inflight and time.monotonic() - inflight < FRAME_ACK_TIMEOUT:
+                    logger.debug("Skipping screenshot for %s: previous frame not acknowledged", session_id)
+                    return
+                
+                # Take screenshot straight from the driver, no file round-trip
                 try:
-                    screenshot_path = agent.save_advanced_screenshot()
+                    with self.session_manager.agent_context(session):
+                        image, mime = self._capture_screenshot(session, agent)
                     
-                    if screenshot_path and os.path.exists(screenshot_path):
-                        # Convert to base64
-                        with open(screenshot_path, 'rb') as f:
-                            screenshot_data = base64.b64encode(f.read()).decode()
-                        
-                        emit('browser_screenshot', {
-                            'image_data': f"data:image/png;base64,{screenshot_data}",
-                            'timestamp': datetime.now().isoformat()
-                        })
+                    if image:
+                        payload = self._screenshot_payload(session, image, mime)
+                        if 'image' in payload:
+                            # Cleared by the client's ack once the frame has arrived
+                            session['frame_inflight'] = time.monotonic()
+                            emit('browser_screenshot', payload,
+                                 callback=lambda *args: session.update(frame_inflight=None))
+                        else:
+                            emit('browser_screenshot', payload)
                     else:
                         emit('error', {'message': 'Failed to capture screenshot'})
+                except SessionClosedError:
+                    emit('error', {'message': 'No active session found'})
                 except Exception as e:
-                    logger.error(f"Screenshot capture error: {e}")
+                    logger.error("Screenshot capture error: %s", e)
                     emit('error', {'message': f'Screenshot error: {str(e)}'})
                     
             except Exception as e:
-                logger.error(f"Error handling screenshot request: {e}")
+                logger.error("Error handling screenshot request: %s", e)
                 emit('error', {'message': f'Screenshot request error: {str(e)}'})
         
         @self.socketio.on('get_browser_info')
@@ -314,43 +817,290 @@ class WebAgentApp:
                 agent = session['agent']
                 
                 # Check if browser is initialized
-                if not hasattr(agent, 'driver') or agent.driver is None:
+                if not session['browser_initialized']:
                     emit('browser_info', {
                         'url': 'about:blank',
                         'title': 'Browser not initialized',
-                        'timestamp': datetime.now().isoformat()
+                        'timestamp': now_ms()
                     })
                     return
                 
-                # Get browser info
+                # Get browser info, from the session unless a turn may have moved the page since
                 try:
-                    current_url = agent.driver.current_url
-                    page_title = agent.driver.title
-                    
-                    # Update session data
-                    session['browser_url'] = current_url
-                    session['browser_title'] = page_title
+                    if session['browser_info_fresh']:
+                        current_url = session['browser_url']
+                        page_title = session['browser_title']
+                    else:
+                        with self.session_manager.agent_context(session):
+                            current_url, page_title = read_page_info(agent.driver)
+                        
+                        # Update session data; a page still loading may move again
+                        session['browser_url'] = current_url
+                        session['browser_title'] = page_title
+                        session['browser_info_fresh'] = not session['navigations_pending']
                     
+                    session['sent_browser_info'] = (current_url, page_title)
                     emit('browser_info', {
                         'url': current_url,
                         'title': page_title,
-                        'timestamp': datetime.now().isoformat()
+                        'timestamp': now_ms()
                     })
                     
+                except SessionClosedError:
+                    emit('error', {'message': 'No active session found'})
                 except Exception as e:
-                    logger.error(f"Browser info error: {e}")
+                    logger.error("Browser info error: %s", e)
+                    session['sent_browser_info'] = None
                     emit('browser_info', {
                         'url': 'Error getting URL',
                         'title': 'Error getting title',
-                        'timestamp': datetime.now().isoformat()
+                        'timestamp': now_ms()
                     })
                     
             except Exception as e:
-                logger.error(f"Error getting browser info: {e}")
+                logger.error("Error getting browser info: %s", e)
                 emit('error', {'message': f'Browser info error: {str(e)}'})
     
+    def _reap_idle_sessions(self):
+        """Periodically clean up sessions with no activity for SESSION_IDLE_TIMEOUT."""
+        while True:
+            self.socketio.sleep(SESSION_REAP_INTERVAL)
+            now = time.time()
+            idle = [session_id for session_id, session in self.session_manager.snapshot()
+                    if now - session['last_activity'] > SESSION_IDLE_TIMEOUT]
+            for session_id in idle:
+                logger.info("Reaping idle session: %s", session_id)
+                self.session_manager.cleanup_session(session_id)
+                self.reaped_sessions += 1
+                self.socketio.emit('error', {
+                    'message': 'Session expired after inactivity. Please refresh the page.'
+                }, room=session_id)
+            # Spare browsers left over from a burst of sessions are reclaimed on the same sweep
+            self.session_manager.pool.trim_idle()
+    
+    def _capture_screenshot(self, session: Dict, agent) -> tuple:
+        """Capture an (image bytes, mime) pair, reusing a frame taken moments ago on the same page.
+        
+        The per-session lock makes concurrent requests wait for one capture and then
+        share its result instead of each hitting the driver.
+        """
+        with session['screenshot_lock']:
+            cached = session['last_screenshot']
+            if (cached and time.monotonic() - cached[0] < SCREENSHOT_CACHE_TTL
+                    and cached[1] == session['browser_url']):
+                return cached[2], cached[3]
+            image, mime = self._grab_frame(agent)
+            session['last_screenshot'] = (time.monotonic(), session['browser_url'], image, mime)
+            return image, mime
+    
+    def _grab_frame(self, agent) -> tuple:
+        """Take a screenshot in SCREENSHOT_FORMAT, falling back to PNG if CDP is unavailable."""
+        if SCREENSHOT_FORMAT != 'png':
+            try:
+                # Chrome encodes lossy frames itself; they are a fraction of the PNG size
+                result = agent.driver.execute_cdp_cmd('Page.captureScreenshot', {
+                    'format': SCREENSHOT_FORMAT,
+                    'quality': SCREENSHOT_QUALITY
+                })
+                return base64.b64decode(result['data']), f'image/{SCREENSHOT_FORMAT}'
+            except Exception as e:
+                logger.debug("CDP screenshot unavailable, using PNG: %s", e)
+        return agent.driver.get_screenshot_as_png(), 'image/png'
+    
+    def _screenshot_payload(self, session: Dict, image: bytes, mime: str,
+                            timestamp: Optional[int] = None) -> Dict:
+        """Build a browser_screenshot payload carrying raw image bytes.
+        
+        Bytes travel as a binary Socket.IO attachment, so no base64 is needed. When
+        the image matches the last one sent to this client, only a marker is sent.
+        """
+        digest = hashlib.blake2b(image, digest_size=16).digest()
+        timestamp = timestamp or now_ms()
+        if session.get('last_screenshot_hash') == digest:
+            return {'unchanged': True, 'timestamp': timestamp}
+        session['last_screenshot_hash'] = digest
+        return {'image': image, 'mime': mime, 'timestamp': timestamp}
+    
+    def _take_message_token(self, session: Dict[str, Any]) -> bool:
+        """Spend one of the session's message tokens, refilling at MESSAGE_RATE per second."""
+        tokens, last = session['message_tokens']
+        now = time.monotonic()
+        tokens = min(MESSAGE_BURST, tokens + (now - last) * MESSAGE_RATE)
+        if tokens < 1:
+            session['message_tokens'] = (tokens, now)
+            return False
+        session['message_tokens'] = (tokens - 1, now)
+        return True
+    
+    def _emit_batch(self, events: List[tuple], room: Optional[str] = None):
+        """Send several events as a single 'batch' frame; the client replays them in order.
+        
+        Without a room this must run inside a Socket.IO handler and replies to its sender.
+        """
+        payload = [[event, data] for event, data in events]
+        if room is None:
+            emit('batch', payload)
+        else:
+            self.socketio.emit('batch', payload, room=room)
+    
+    def _drain_turns(self, session_id: str):
+        """Run a session's queued turns in order while holding its browser.
+        
+        One driver can't take overlapping actions, so messages sent mid-turn wait here.
+        """
+        session = self.session_manager.get_session(session_id)
+        if not session:
+            return
+        try:
+            while session['pending_turns'] and self.session_manager.get_session(session_id) is session:
+                message = session['pending_turns'].popleft()
+                with self.session_manager.agent_context(session):
+                    self._process_agent_message(session_id, message)
+        except SessionClosedError:
+            logger.debug("Dropping queued turns for closed session %s", session_id)
+        finally:
+            session['turn_running'] = False
+    
+    def _handle_navigate(self, session: Dict, agent, message: str, keywords: frozenset,
+                         turn_events: List[tuple], turn_timestamp: int) -> tuple:
+        """Open the first known site named in the message."""
+        for keyword, (url, name) in NAVIGATION_TARGETS.items():
+            if keyword in keywords:
+                if self._start_navigation(session, agent, url):
+                    return (f"Opening {name} as requested; the page info will update once it has loaded.",
+                            NAVIGATION_ACTIONS[keyword])
+                return (f"I navigated to {name} as requested.",
+                        NAVIGATION_ACTIONS[keyword])
+        return ("I understand you want to navigate somewhere. Please specify a clear URL or website name (e.g., 'go to Google', 'navigate to GitHub').",
+                PARSE_NAVIGATION_ACTIONS)
+    
+    def _start_navigation(self, session: Dict, agent, url: str) -> bool:
+        """Navigate without waiting for the page to load; navigation_complete follows when it has.
+        
+        driver.get() blocks until the load event, which would hold the reply for the
+        whole page load. CDP's Page.navigate returns once the navigation has started.
+        Returns False if CDP was unavailable and the page was loaded synchronously.
+        """
+        try:
+            agent.driver.execute_cdp_cmd('Page.navigate', {'url': url})
+        except Exception as e:
+            logger.debug("CDP navigation unavailable, loading synchronously: %s", e)
+            agent.driver.get(url)
+            return False
+        self._begin_watch(session)
+        return True
+    
+    def _begin_watch(self, session: Dict, previous_url: Optional[str] = None):
+        """Watch a page load the current turn started, in the background."""
+        session['navigations_pending'] += 1
+        self.socketio.start_background_task(self._watch_navigation, session, previous_url)
+    
+    def _watch_navigation(self, session: Dict, previous_url: Optional[str] = None):
+        """Background task for _begin_watch; the load counts as finished however this ends."""
+        try:
+            self._poll_navigation(session, previous_url)
+        except Exception as e:
+            logger.error("Error watching navigation for %s: %s", session['id'], e)
+        finally:
+            session['navigations_pending'] -= 1
+    
+    def _poll_navigation(self, session: Dict, previous_url: Optional[str]):
+        """Wait for the session's page to finish loading, then push its URL and title.
+        
+        A submitted form may not have left previous_url yet when polling starts, so
+        that page's load doesn't count.
+        """
+        session_id = session['id']
+        deadline = time.monotonic() + NAVIGATION_TIMEOUT
+        while time.monotonic() < deadline:
+            self.socketio.sleep(NAVIGATION_POLL_INTERVAL)
+            if self.session_manager.get_session(session_id) is not session:
+                return
+            try:
+                with self.session_manager.agent_context(session):
+                    driver = session['agent'].driver
+                    if driver.execute_script('return document.readyState') != 'complete':
+                        continue
+                    url, title = read_page_info(driver)
+            except SessionClosedError:
+                return
+            except WebDriverException as e:
+                logger.debug("Stopped watching navigation for %s: %s", session_id, e)
+                return
+            if url == previous_url:
+                continue
+            session['browser_url'] = url
+            session['browser_title'] = title
+            session['browser_info_fresh'] = True
+            session['last_screenshot'] = None
+            if (url, title) == session['sent_browser_info']:
+                return
+            session['sent_browser_info'] = (url, title)
+            self.socketio.emit('navigation_complete', {
+                'url': url,
+                'title': title,
+                'timestamp': now_ms()
+            }, room=session_id)
+            return
+    
+    def _wait_for_load(self, driver):
+        """Hold the current turn until the page has loaded, for at most NAVIGATION_TIMEOUT."""
+        deadline = time.monotonic() + NAVIGATION_TIMEOUT
+        while (driver.execute_script('return document.readyState') != 'complete'
+               and time.monotonic() < deadline):
+            self.socketio.sleep(NAVIGATION_POLL_INTERVAL)
+    
+    def _handle_search(self, session: Dict, agent, message: str, keywords: frozenset,
+                       turn_events: List[tuple], turn_timestamp: int) -> tuple:
+        """Type the query into Google's search box."""
+        if session['navigations_pending'] and session['browser_initialized']:
+            # The search box belongs to the page still loading, not the one it replaces
+            self._wait_for_load(agent.driver)
+        current_url = session['browser_initialized'] and agent.driver.current_url
+        if not current_url:
+            return ("Please navigate to a search engine first, then I can help you search.",
+                    SEARCH_PREREQUISITE_ACTIONS)
+        if "google.com" not in current_url:
+            return ("To search, please first navigate to a search engine like Google.",
+                    SEARCH_VALIDATION_ACTIONS)
+        # Try to find and use search box
+        try:
+            search_box = agent.driver.find_element(By.NAME, "q")
+            search_terms = message.replace("search for", "").replace("search", "").strip()
+            search_box.send_keys(search_terms)
+            search_box.send_keys(Keys.RETURN)
+        except Exception:
+            return ("I tried to search but couldn't find the search box. Please try navigating to Google first.",
+                    SEARCH_FAILED_ACTIONS)
+        # The results page loads after the reply; its URL and title follow in navigation_complete
+        self._begin_watch(session, current_url)
+        return (f"I searched for '{search_terms}' on Google.", SEARCH_ACTIONS)
+    
+    def _handle_capture(self, session: Dict, agent, message: str, keywords: frozenset,
+                        turn_events: List[tuple], turn_timestamp: int) -> tuple:
+        """Take a screenshot straight from the driver's memory, no file round-trip."""
+        try:
+            image, mime = self._capture_screenshot(session, agent)
+        except Exception as e:
+            return (f"Screenshot failed: {str(e)}",
+                    CAPTURE_FAILED_ACTIONS)
+        if not image:
+            return ("I attempted to take a screenshot but encountered an issue.",
+                    CAPTURE_FAILED_ACTIONS)
+        # Send the screenshot with the response in the closing batch
+        turn_events.append(('browser_screenshot',
+                            self._screenshot_payload(session, image, mime, turn_timestamp)))
+        return ("I took a screenshot of the current page.",
+                CAPTURE_ACTIONS)
+    
+    def _handle_unrecognized(self, session: Dict, agent, message: str, keywords: frozenset,
+                             turn_events: List[tuple], turn_timestamp: int) -> tuple:
+        """General response for unrecognized commands."""
+        return (f'I received your message: "{message}".' + HELP_TEXT_SUFFIX,
+                ANALYZE_ACTIONS)
+    
     def _process_agent_message(self, session_id: str, message: str):
-        """Process message with the agent in a separate thread."""
+        """Process message with the agent on a worker green thread."""
         try:
             session = self.session_manager.get_session(session_id)
             if not session:
@@ -361,139 +1111,72 @@ class WebAgentApp:
             # Update session status
             session['status'] = 'processing'
             
-            # Emit status update
-            self.socketio.emit('status_update', {
-                'status': 'processing',
-                'message': 'Agent is analyzing your request...'
-            }, room=session_id)
-            
-            # Initialize the agent if needed
-            if not hasattr(agent, 'driver') or agent.driver is None:
-                try:
-                    agent._initialize_driver()
-                    agent._initialize_advanced_visual_elements()
-                    
-                    # Navigate to a blank page initially
-                    agent.driver.get("about:blank")
-                    
-                    self.socketio.emit('status_update', {
-                        'status': 'processing',
-                        'message': 'Browser session initialized. Processing your request...'
-                    }, room=session_id)
-                    
-                except Exception as e:
-                    logger.error(f"Error initializing agent driver: {e}")
-                    self.socketio.emit('error', {
-                        'message': f'Failed to initialize browser session: {str(e)}'
-                    }, room=session_id)
-                    return
+            # Agents start their driver on construction, so a session without one
+            # never got a browser and has nothing to drive
+            if not session['browser_initialized']:
+                reason = session.get('error', 'the browser did not start')
+                logger.error("Session %s has no browser: %s", session_id, reason)
+                session['status'] = 'error'
+                self._emit_batch([
+                    ('typing_stop', None),
+                    ('error', {
+                        'message': f'This session has no browser (creation failed: {reason}). '
+                                   'Please refresh the page.'
+                    })
+                ], room=session_id)
+                return
             
             # Process the objective with a simplified approach
             # For demo purposes, we'll perform basic navigation based on the message
             response_content = ""
-            actions_taken = []
+            actions_taken = ()
+            # One timestamp for every event this turn emits
+            turn_timestamp = now_ms()
+            # Any action below may change what is on screen, so cached frames can't be trusted
+            session['last_screenshot'] = None
+            # Extra events delivered with the response in the closing batch
+            turn_events = []
             
             try:
-                # Simple command parsing
-                message_lower = message.lower()
-                
-                if "navigate" in message_lower or "go to" in message_lower:
-                    # Extract URL or domain
-                    if "google" in message_lower:
-                        agent.driver.get("https://www.google.com")
-                        response_content = "I navigated to Google.com as requested."
-                        actions_taken.append({'action': 'navigate_to_google', 'status': 'completed'})
-                    elif "github" in message_lower:
-                        agent.driver.get("https://github.com")
-                        response_content = "I navigated to GitHub.com as requested."
-                        actions_taken.append({'action': 'navigate_to_github', 'status': 'completed'})
-                    elif "example" in message_lower:
-                        agent.driver.get("https://example.com")
-                        response_content = "I navigated to Example.com as requested."
-                        actions_taken.append({'action': 'navigate_to_example', 'status': 'completed'})
-                    else:
-                        response_content = "I understand you want to navigate somewhere. Please specify a clear URL or website name (e.g., 'go to Google', 'navigate to GitHub')."
-                        actions_taken.append({'action': 'parse_navigation_request', 'status': 'completed'})
-                
-                elif "search" in message_lower:
-                    if hasattr(agent, 'driver') and agent.driver.current_url:
-                        current_url = agent.driver.current_url
-                        if "google.com" in current_url:
-                            # Try to find and use search box
-                            try:
-                                search_box = agent.driver.find_element(By.NAME, "q")
-                                search_terms = message.replace("search for", "").replace("search", "").strip()
-                                search_box.send_keys(search_terms)
-                                search_box.send_keys(Keys.RETURN)
-                                response_content = f"I searched for '{search_terms}' on Google."
-                                actions_taken.extend([
-                                    {'action': 'find_search_box', 'status': 'completed'},
-                                    {'action': 'enter_search_terms', 'status': 'completed'},
-                                    {'action': 'submit_search', 'status': 'completed'}
-                                ])
-                            except Exception as e:
-                                response_content = "I tried to search but couldn't find the search box. Please try navigating to Google first."
-                                actions_taken.append({'action': 'search_attempt', 'status': 'failed'})
-                        else:
-                            response_content = "To search, please first navigate to a search engine like Google."
-                            actions_taken.append({'action': 'search_validation', 'status': 'completed'})
-                    else:
-                        response_content = "Please navigate to a search engine first, then I can help you search."
-                        actions_taken.append({'action': 'search_prerequisite_check', 'status': 'completed'})
-                
-                elif "screenshot" in message_lower or "capture" in message_lower:
-                    # Take a screenshot using the agent
-                    try:
-                        screenshot_path = agent.save_advanced_screenshot()
-                        if screenshot_path and os.path.exists(screenshot_path):
-                            response_content = "I took a screenshot of the current page."
-                            actions_taken.append({'action': 'capture_screenshot', 'status': 'completed'})
-                            
-                            # Send the screenshot via WebSocket
-                            with open(screenshot_path, 'rb') as f:
-                                screenshot_data = base64.b64encode(f.read()).decode()
-                            
-                            self.socketio.emit('browser_screenshot', {
-                                'image_data': f"data:image/png;base64,{screenshot_data}",
-                                'timestamp': datetime.now().isoformat()
-                            }, room=session_id)
-                        else:
-                            response_content = "I attempted to take a screenshot but encountered an issue."
-                            actions_taken.append({'action': 'capture_screenshot', 'status': 'failed'})
-                    except Exception as e:
-                        response_content = f"Screenshot failed: {str(e)}"
-                        actions_taken.append({'action': 'capture_screenshot', 'status': 'failed'})
+                # Simple command parsing: one scan picks the intent, a dict picks the handler
+                intent, keywords = classify_intent(message.strip().lower())
+                if intent in PAGE_CHANGING_INTENTS:
+                    session['browser_info_fresh'] = False
+                handler = self._intent_handlers.get(intent, self._handle_unrecognized)
+                response_content, actions_taken = handler(
+                    session, agent, message, keywords, turn_events, turn_timestamp)
                 
-                else:
-                    # General response for unrecognized commands
-                    response_content = f'I received your message: "{message}". I can help you with browser automation tasks like:\n\n• "Navigate to Google" or "Go to GitHub"\n• "Search for AI news" (after navigating to Google)\n• "Take a screenshot"\n\nPlease give me a specific command to execute.'
-                    actions_taken.append({'action': 'analyze_request', 'status': 'completed'})
-                
-                # Update browser info in session
+                # Update browser info in session; chat-only turns leave it as it was, and
+                # a page still loading is reported by its watcher instead
                 try:
-                    if hasattr(agent, 'driver') and agent.driver:
-                        session['browser_url'] = agent.driver.current_url
-                        session['browser_title'] = agent.driver.title
+                    if (session['browser_initialized'] and not session['browser_info_fresh']
+                            and not session['navigations_pending'] and agent.driver is not None):
+                        session['browser_url'], session['browser_title'] = read_page_info(agent.driver)
+                        session['browser_info_fresh'] = True
                         
-                        # Send updated browser info
-                        self.socketio.emit('browser_info', {
-                            'url': session['browser_url'],
-                            'title': session['browser_title'],
-                            'timestamp': datetime.now().isoformat()
-                        }, room=session_id)
-                except:
-                    pass  # Ignore browser info errors
+                        # Send updated browser info along with the response, unless the
+                        # client already has exactly this
+                        info = (session['browser_url'], session['browser_title'])
+                        if info != session['sent_browser_info']:
+                            session['sent_browser_info'] = info
+                            turn_events.append(('browser_info', {
+                                'url': info[0],
+                                'title': info[1],
+                                'timestamp': turn_timestamp
+                            }))
+                except WebDriverException as e:
+                    logger.debug("Skipping browser info update for %s: %s", session_id, e)
                 
             except Exception as e:
-                logger.error(f"Error processing agent command: {e}")
+                logger.error("Error processing agent command: %s", e)
                 response_content = f"I encountered an error while processing your request: {str(e)}"
-                actions_taken.append({'action': 'error_handling', 'status': 'failed'})
+                actions_taken = (*actions_taken, ERROR_HANDLING_ACTION)
             
             # Create agent response
             agent_response = {
                 'type': 'agent',
                 'content': response_content,
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': turn_timestamp,
                 'actions_taken': actions_taken
             }
             
@@ -504,21 +1187,24 @@ class WebAgentApp:
             session['status'] = 'ready'
             
             # Stop typing indicator and send response
-            self.socketio.emit('typing_stop', room=session_id)
-            self.socketio.emit('agent_response', agent_response, room=session_id)
-            self.socketio.emit('status_update', {
-                'status': 'ready',
-                'message': 'Agent is ready for next command'
-            }, room=session_id)
+            self._emit_batch([
+                ('typing_stop', None),
+                *turn_events,
+                ('agent_response', agent_response),
+                ('status_update', {
+                    'status': 'ready',
+                    'message': 'Agent is ready for next command'
+                })
+            ], room=session_id)
             
         except Exception as e:
-            logger.error(f"Error processing agent message: {e}")
+            logger.error("Error processing agent message: %s", e)
             
             # Stop typing and send error
-            self.socketio.emit('typing_stop', room=session_id)
-            self.socketio.emit('error', {
-                'message': f'Agent processing error: {str(e)}'
-            }, room=session_id)
+            self._emit_batch([
+                ('typing_stop', None),
+                ('error', {'message': f'Agent processing error: {str(e)}'})
+            ], room=session_id)
             
             # Update session status
             if session:
@@ -526,20 +1212,47 @@ class WebAgentApp:
     
     def run(self):
         """Run the web application."""
-        logger.info(f"Starting Web Agent App on {self.host}:{self.port}")
+        logger.info("Starting Web Agent App on %s:%s", self.host, self.port)
         print(f"\n🌐 AI Browser Agent Web Interface")
         print(f"🚀 Server starting on http://{self.host}:{self.port}")
         print(f"📱 Open your browser and navigate to the URL above")
         print(f"💬 Enjoy the ChatGPT-like interface for browser automation!")
         
-        self.socketio.run(
+        if self.debug:
+            self.socketio.run(
+                self.app,
+                host=self.host,
+                port=self.port,
+                debug=self.debug,
+                use_reloader=False  # Disable reloader to prevent issues with threading
+            )
+            return
+        
+        # Serve straight from eventlet with a deep accept backlog and no per-request access log
+        listener = eventlet.listen((self.host, self.port), backlog=LISTEN_BACKLOG)
+        # Accepted connections inherit these: flush small emits immediately, and use
+        # fixed kernel buffers only when explicitly configured
+        listener.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if SOCKET_BUFFER_SIZE is not None:
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+        if SERVER_CPU is not None and hasattr(os, 'sched_setaffinity'):
+            # Keep the single-threaded hub on one core; opt-in, as CPU quotas may forbid it.
+            # create_agent() launches browsers with the original mask, not this one.
+            os.sched_setaffinity(0, {SERVER_CPU})
+        eventlet.wsgi.server(
+            listener,
             self.app,
-            host=self.host,
-            port=self.port,
-            debug=self.debug,
-            use_reloader=False  # Disable reloader to prevent issues with threading
+            log_output=False,
+            keepalive=True,
+            socket_timeout=60,
+            minimum_chunk_size=4096
         )
 
+def create_application():
+    """WSGI entry point for gunicorn: ``gunicorn -k eventlet 'web_app:create_application()'``."""
+    return WebAgentApp().app
+
 def main():
     """Main entry point for web application."""
     import argparse
@@ -560,7 +1273,7 @@ def main():
         print("\n⏹️ Shutting down web server...")
         logger.info("Web server shutdown requested")
     except Exception as e:
-        logger.error(f"Web server error: {e}")
+        logger.error("Web server error: %s", e)
         print(f"❌ Server error: {e}")
 
 if __name__ == '__main__':